@@ -4,16 +4,145 @@ from prettytable import PrettyTable
 
 from .decorators import confirm_action, create_cacher, handle_db_errors, log_time
 from .parser import parse_insert_values, parse_set_clause, parse_where_clause
-from .utils import load_table_data, save_table_data
+from .utils import (
+    delete_legacy_table_data,
+    delete_segment,
+    delete_table_data,
+    load_segment,
+    load_table_data,
+    save_metadata,
+    save_segment,
+)
 
 METADATA_FILE = "db_meta.json"
 VALID_TYPES = {"int", "str", "bool"}
+SEGMENT_SIZE = 65536
 
 
 def validate_column_type(col_type: str) -> bool:
     return col_type.lower() in VALID_TYPES
 
 
+def record_matches(record: Dict[str, Any], where_clause: Dict[str, Any]) -> bool:
+    for column, value in where_clause.items():
+        if column not in record or record[column] != value:
+            return False
+    return True
+
+
+def compute_segment_stats(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Считает min/max по каждому столбцу сегмента.
+
+    Если значения столбца несравнимы между собой, статистика для него
+    равна None и сегмент по этому столбцу не отсекается.
+    """
+    columns: Dict[str, List[Any]] = {}
+    for record in records:
+        for column, value in record.items():
+            columns.setdefault(column, []).append(value)
+
+    stats: Dict[str, Any] = {}
+    for column, values in columns.items():
+        try:
+            stats[column] = {"min": min(values), "max": max(values)}
+        except TypeError:
+            stats[column] = None
+    return stats
+
+
+def segment_may_match(stats: Dict[str, Any], where_clause: Dict[str, Any]) -> bool:
+    """Проверяет, может ли сегмент содержать записи под условие WHERE."""
+    for column, value in where_clause.items():
+        if column not in stats:
+            return False
+        column_stats = stats[column]
+        if column_stats is None:
+            continue
+        try:
+            if value < column_stats["min"] or value > column_stats["max"]:
+                return False
+        except TypeError:
+            continue
+    return True
+
+
+def merge_segment_stats(
+    old_stats: Dict[str, Any], new_stats: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Объединяет статистику так, чтобы она покрывала оба набора значений."""
+    merged = dict(old_stats)
+    for column, column_stats in new_stats.items():
+        if column not in merged:
+            merged[column] = column_stats
+            continue
+        old_column_stats = merged[column]
+        if old_column_stats is None or column_stats is None:
+            merged[column] = None
+            continue
+        try:
+            merged[column] = {
+                "min": min(old_column_stats["min"], column_stats["min"]),
+                "max": max(old_column_stats["max"], column_stats["max"]),
+            }
+        except TypeError:
+            merged[column] = None
+    return merged
+
+
+def store_segment(
+    metadata: Dict[str, Any],
+    table_name: str,
+    segment: Dict[str, Any],
+    records: List[Dict[str, Any]],
+) -> None:
+    """Сохраняет сегмент на диск и обновляет его метаданные.
+
+    Перед записью файла в db_meta.json сохраняется статистика, покрывающая
+    и старое, и новое содержимое сегмента, поэтому прерванная запись
+    не приводит к отсечению сегмента с реально лежащими в нём данными.
+    """
+    new_stats = compute_segment_stats(records)
+    widened_stats = merge_segment_stats(segment.get("stats", {}), new_stats)
+    widened_rows = max(segment.get("rows", 0), len(records))
+    if widened_stats != segment.get("stats") or widened_rows != segment.get("rows"):
+        segment["stats"] = widened_stats
+        segment["rows"] = widened_rows
+        save_metadata(METADATA_FILE, metadata)
+
+    save_segment(table_name, segment["id"], records)
+    segment["rows"] = len(records)
+    segment["stats"] = new_stats
+
+
+def get_table_segments(
+    metadata: Dict[str, Any], table_name: str
+) -> List[Dict[str, Any]]:
+    """Возвращает список сегментов таблицы.
+
+    Таблицы старого формата (один файл data/<table>.json) при первом
+    обращении разбиваются на сегменты по SEGMENT_SIZE записей. Старый файл
+    удаляется только после того, как сегменты записаны в db_meta.json.
+    """
+    table_schema = metadata[table_name]
+    if "segments" not in table_schema:
+        table_data = load_table_data(table_name)
+        segments = []
+        for start in range(0, len(table_data), SEGMENT_SIZE):
+            segment_data = table_data[start:start + SEGMENT_SIZE]
+            save_segment(table_name, len(segments), segment_data)
+            segments.append(
+                {
+                    "id": len(segments),
+                    "rows": len(segment_data),
+                    "stats": compute_segment_stats(segment_data),
+                }
+            )
+        table_schema["segments"] = segments
+        save_metadata(METADATA_FILE, metadata)
+        delete_legacy_table_data(table_name)
+    return table_schema["segments"]
+
+
 @handle_db_errors
 def create_table(
     metadata: Dict[str, Any], table_name: str, columns: List[Tuple[str, str]]
@@ -35,9 +164,10 @@ def create_table(
     metadata[table_name] = {
         "columns": table_columns,
         "column_types": {col[0]: col[1] for col in table_columns},
+        "segments": [],
     }
 
-    save_table_data(table_name, [])
+    delete_table_data(table_name)
 
     return metadata
 
@@ -50,11 +180,7 @@ def drop_table(metadata: Dict[str, Any], table_name: str) -> Dict[str, Any]:
 
     del metadata[table_name]
 
-    import os
-
-    data_file = f"data/{table_name}.json"
-    if os.path.exists(data_file):
-        os.remove(data_file)
+    delete_table_data(table_name)
 
     return metadata
 
@@ -76,11 +202,11 @@ def show_table_structure(metadata: Dict[str, Any], table_name: str) -> Dict[str,
 @log_time
 def insert(
     metadata: Dict[str, Any], table_name: str, values_str: str
-) -> List[Dict[str, Any]]:
+) -> Dict[str, Any]:
     if table_name not in metadata:
         raise ValueError(f"Таблица '{table_name}' не существует")
 
-    table_data = load_table_data(table_name)
+    segments = get_table_segments(metadata, table_name)
 
     table_schema = metadata[table_name]
     column_types = table_schema["column_types"]
@@ -89,10 +215,18 @@ def insert(
     if errors:
         raise ValueError("; ".join(errors))
 
-    if table_data:
-        new_id = max(record["ID"] for record in table_data) + 1
-    else:
-        new_id = 1
+    id_maxima = []
+    for segment in segments:
+        id_stats = segment["stats"].get("ID")
+        if id_stats is not None:
+            id_maxima.append(id_stats["max"])
+        else:
+            id_maxima.extend(
+                record["ID"]
+                for record in load_segment(table_name, segment["id"])
+                if isinstance(record.get("ID"), int)
+            )
+    new_id = max(id_maxima, default=0) + 1
 
     new_record = {"ID": new_id}
     columns = list(column_types.keys())[1:]
@@ -100,10 +234,25 @@ def insert(
     for i, column in enumerate(columns):
         new_record[column] = values[i]
 
-    table_data.append(new_record)
-    save_table_data(table_name, table_data)
+    if segments and segments[-1]["rows"] < SEGMENT_SIZE:
+        segment = segments[-1]
+        segment_data = load_segment(table_name, segment["id"])
+    else:
+        segment = {
+            "id": max((seg["id"] for seg in segments), default=-1) + 1,
+            "rows": 0,
+            "stats": {},
+        }
+        segments.append(segment)
+        segment_data = []
+
+    segment_data.append(new_record)
+    try:
+        store_segment(metadata, table_name, segment, segment_data)
+    finally:
+        save_metadata(METADATA_FILE, metadata)
 
-    return table_data
+    return metadata
 
 
 @handle_db_errors
@@ -115,22 +264,16 @@ def select(
         raise ValueError(f"Таблица '{table_name}' не существует")
 
     def _execute_select():
-        table_data = load_table_data(table_name)
-
-        if not where_str:
-            return table_data
-
+        segments = get_table_segments(metadata, table_name)
         where_clause = parse_where_clause(where_str)
 
         filtered_data = []
-        for record in table_data:
-            match = True
-            for column, value in where_clause.items():
-                if column not in record or record[column] != value:
-                    match = False
-                    break
-            if match:
-                filtered_data.append(record)
+        for segment in segments:
+            if not segment_may_match(segment["stats"], where_clause):
+                continue
+            for record in load_segment(table_name, segment["id"]):
+                if record_matches(record, where_clause):
+                    filtered_data.append(record)
 
         return filtered_data
 
@@ -141,11 +284,11 @@ def select(
 @handle_db_errors
 def update(
     metadata: Dict[str, Any], table_name: str, set_str: str, where_str: str
-) -> List[Dict[str, Any]]:
+) -> Dict[str, Any]:
     if table_name not in metadata:
         raise ValueError(f"Таблица '{table_name}' не существует")
 
-    table_data = load_table_data(table_name)
+    segments = get_table_segments(metadata, table_name)
 
     set_clause = parse_set_clause(set_str)
     where_clause = parse_where_clause(where_str)
@@ -154,61 +297,87 @@ def update(
     valid_columns = table_schema["columns"]
     valid_column_names = [col[0] for col in valid_columns]
 
-    for column in set_clause.keys():
+    column_types = dict(valid_columns)
+
+    for column, new_value in set_clause.items():
         if column not in valid_column_names:
             error_msg = f"Столбец '{column}' не существует в таблице '{table_name}'"
             raise ValueError(error_msg)
 
-    updated_count = 0
-    for record in table_data:
-        match = True
-        for column, value in where_clause.items():
-            if column not in record or record[column] != value:
-                match = False
-                break
-
-        if match:
-            for column, new_value in set_clause.items():
-                record[column] = new_value
-            updated_count += 1
+        expected_type = column_types[column]
+        if expected_type == "int" and (
+            not isinstance(new_value, int) or isinstance(new_value, bool)
+        ):
+            error_msg = f"Столбец '{column}' должен быть int, получено: {new_value}"
+            raise ValueError(error_msg)
+        if expected_type == "bool" and not isinstance(new_value, bool):
+            error_msg = f"Столбец '{column}' должен быть bool, получено: {new_value}"
+            raise ValueError(error_msg)
 
-    if updated_count > 0:
-        save_table_data(table_name, table_data)
+    touched = False
+    try:
+        for segment in segments:
+            if not segment_may_match(segment["stats"], where_clause):
+                continue
+
+            segment_data = load_segment(table_name, segment["id"])
+            updated_count = 0
+            for record in segment_data:
+                if record_matches(record, where_clause):
+                    for column, new_value in set_clause.items():
+                        record[column] = new_value
+                    updated_count += 1
+
+            if updated_count > 0:
+                touched = True
+                store_segment(metadata, table_name, segment, segment_data)
+    finally:
+        if touched:
+            save_metadata(METADATA_FILE, metadata)
 
-    return table_data
+    return metadata
 
 
 @handle_db_errors
 @confirm_action("удаление записей")
 def delete(
     metadata: Dict[str, Any], table_name: str, where_str: str
-) -> List[Dict[str, Any]]:
+) -> Dict[str, Any]:
     if table_name not in metadata:
         raise ValueError(f"Таблица '{table_name}' не существует")
 
-    table_data = load_table_data(table_name)
+    segments = get_table_segments(metadata, table_name)
 
     where_clause = parse_where_clause(where_str)
 
-    new_data = []
-    deleted_count = 0
-
-    for record in table_data:
-        match = True
-        for column, value in where_clause.items():
-            if column not in record or record[column] != value:
-                match = False
-                break
+    touched = False
+    try:
+        for segment in list(segments):
+            if not segment_may_match(segment["stats"], where_clause):
+                continue
+
+            segment_data = load_segment(table_name, segment["id"])
+            new_data = [
+                record
+                for record in segment_data
+                if not record_matches(record, where_clause)
+            ]
+
+            if len(new_data) == len(segment_data):
+                continue
+
+            touched = True
+            if new_data:
+                store_segment(metadata, table_name, segment, new_data)
+            else:
+                segments.remove(segment)
+                save_metadata(METADATA_FILE, metadata)
+                delete_segment(table_name, segment["id"])
+    finally:
+        if touched:
+            save_metadata(METADATA_FILE, metadata)
 
-        if not match:
-            new_data.append(record)
-        else:
-            deleted_count += 1
-
-    if deleted_count > 0:
-        save_table_data(table_name, new_data)
-
-    return new_data
+    return metadata
 
 
 def format_table_output(
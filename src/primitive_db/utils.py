@@ -1,8 +1,20 @@
 import json
 import os
+import shutil
 from typing import Any, Dict, List
 
 
+def write_json(filepath: str, data: Any) -> None:
+    """Атомарно записывает JSON: сначала во временный файл, затем подменяет."""
+    dir_path = os.path.dirname(filepath) if os.path.dirname(filepath) else "."
+    os.makedirs(dir_path, exist_ok=True)
+
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, filepath)
+
+
 def load_metadata(filepath: str) -> Dict[str, Any]:
     try:
         with open(filepath, "r", encoding="utf-8") as f:
@@ -12,11 +24,7 @@ def load_metadata(filepath: str) -> Dict[str, Any]:
 
 
 def save_metadata(filepath: str, data: Dict[str, Any]) -> None:
-    dir_path = os.path.dirname(filepath) if os.path.dirname(filepath) else "."
-    os.makedirs(dir_path, exist_ok=True)
-
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    write_json(filepath, data)
 
 
 def load_table_data(table_name: str) -> List[Dict[str, Any]]:
@@ -28,9 +36,36 @@ def load_table_data(table_name: str) -> List[Dict[str, Any]]:
         return []
 
 
-def save_table_data(table_name: str, data: List[Dict[str, Any]]) -> None:
+def delete_legacy_table_data(table_name: str) -> None:
     filepath = f"data/{table_name}.json"
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    if os.path.exists(filepath):
+        os.remove(filepath)
+
+
+def delete_table_data(table_name: str) -> None:
+    delete_legacy_table_data(table_name)
+
+    dir_path = f"data/{table_name}"
+    if os.path.isdir(dir_path):
+        shutil.rmtree(dir_path)
+
+
+def load_segment(table_name: str, segment_id: int) -> List[Dict[str, Any]]:
+    filepath = f"data/{table_name}/{segment_id:05d}.json"
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_segment(
+    table_name: str, segment_id: int, data: List[Dict[str, Any]]
+) -> None:
+    write_json(f"data/{table_name}/{segment_id:05d}.json", data)
+
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+def delete_segment(table_name: str, segment_id: int) -> None:
+    filepath = f"data/{table_name}/{segment_id:05d}.json"
+    if os.path.exists(filepath):
+        os.remove(filepath)
\ No newline at end of file
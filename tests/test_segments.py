@@ -0,0 +1,172 @@
+import json
+import os
+
+import pytest
+
+from primitive_db import core
+from primitive_db.decorators import create_cacher
+from primitive_db.utils import load_metadata, load_segment
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(core, "SEGMENT_SIZE", 2)
+    monkeypatch.setattr(core, "query_cacher", create_cacher())
+    monkeypatch.setattr("builtins.input", lambda prompt: "y")
+
+    written = []
+    save_segment = core.save_segment
+
+    def recording_save_segment(table_name, segment_id, data):
+        written.append(segment_id)
+        save_segment(table_name, segment_id, data)
+
+    monkeypatch.setattr(core, "save_segment", recording_save_segment)
+
+    metadata = {}
+    core.create_table(metadata, "users", [("name", "str"), ("age", "int")])
+    return metadata, written
+
+
+def fill(metadata, count):
+    for i in range(count):
+        core.insert(metadata, "users", f"user{i} {20 + i}")
+
+
+def segment_ids(metadata):
+    return [segment["id"] for segment in metadata["users"]["segments"]]
+
+
+def test_insert_rolls_over_to_new_segment(db):
+    metadata, _ = db
+    fill(metadata, 5)
+
+    segments = metadata["users"]["segments"]
+    assert [segment["rows"] for segment in segments] == [2, 2, 1]
+    assert segments[1]["stats"]["age"] == {"min": 22, "max": 23}
+    assert sorted(os.listdir("data/users")) == [
+        "00000.json",
+        "00001.json",
+        "00002.json",
+    ]
+    assert load_metadata(core.METADATA_FILE)["users"]["segments"] == segments
+
+
+def test_select_skips_segments_and_returns_all_matches(db, monkeypatch):
+    metadata, _ = db
+    fill(metadata, 6)
+    core.update(metadata, "users", "age = 21", "ID = 6")
+
+    loaded = []
+    load = core.load_segment
+
+    def recording_load_segment(table_name, segment_id):
+        loaded.append(segment_id)
+        return load(table_name, segment_id)
+
+    monkeypatch.setattr(core, "load_segment", recording_load_segment)
+
+    result = core.select(metadata, "users", "age = 21")
+
+    assert sorted(record["ID"] for record in result) == [2, 6]
+    assert loaded == [0, 2]
+
+
+def test_update_rewrites_only_matching_segment(db):
+    metadata, written = db
+    fill(metadata, 6)
+    written.clear()
+
+    core.update(metadata, "users", "age = 99", "name = user3")
+
+    assert written == [1]
+    assert metadata["users"]["segments"][1]["stats"]["age"] == {
+        "min": 22,
+        "max": 99,
+    }
+    assert core.select(metadata, "users", "age = 99")[0]["ID"] == 4
+
+
+def test_update_rejects_value_of_wrong_type(db):
+    metadata, written = db
+    fill(metadata, 2)
+    written.clear()
+
+    assert core.update(metadata, "users", "ID = abc", "ID = 2") is None
+    assert written == []
+
+
+def test_delete_rewrites_only_matching_segment(db):
+    metadata, written = db
+    fill(metadata, 6)
+    written.clear()
+
+    core.delete(metadata, "users", "age = 24")
+
+    assert written == [2]
+    assert metadata["users"]["segments"][2]["rows"] == 1
+
+
+def test_delete_removes_emptied_segment(db):
+    metadata, _ = db
+    fill(metadata, 4)
+
+    core.delete(metadata, "users", "age = 20")
+    core.delete(metadata, "users", "age = 21")
+
+    assert segment_ids(metadata) == [1]
+    assert os.listdir("data/users") == ["00001.json"]
+    assert segment_ids(load_metadata(core.METADATA_FILE)) == [1]
+
+
+def test_failed_update_keeps_rewritten_segments_visible(db, monkeypatch):
+    metadata, _ = db
+    fill(metadata, 4)
+    core.update(metadata, "users", "age = 20", "ID = 3")
+    save_segment = core.save_segment
+    calls = []
+
+    def failing_save_segment(table_name, segment_id, data):
+        calls.append(segment_id)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        save_segment(table_name, segment_id, data)
+
+    monkeypatch.setattr(core, "save_segment", failing_save_segment)
+    assert core.update(metadata, "users", "age = 99", "age = 20") is None
+
+    on_disk = load_metadata(core.METADATA_FILE)
+    result = core.select(on_disk, "users", "age = 99")
+    assert [record["ID"] for record in result] == [1]
+
+
+def test_legacy_table_is_migrated_to_segments(db):
+    metadata, _ = db
+    os.makedirs("data", exist_ok=True)
+    legacy_data = [{"ID": i, "name": f"user{i}"} for i in range(1, 6)]
+    with open("data/legacy.json", "w", encoding="utf-8") as f:
+        json.dump(legacy_data, f)
+    metadata["legacy"] = {
+        "columns": [["ID", "int"], ["name", "str"]],
+        "column_types": {"ID": "int", "name": "str"},
+    }
+
+    result = core.select(metadata, "legacy", "name = user5")
+
+    assert result == [{"ID": 5, "name": "user5"}]
+    assert not os.path.exists("data/legacy.json")
+    segments = load_metadata(core.METADATA_FILE)["legacy"]["segments"]
+    assert [segment["rows"] for segment in segments] == [2, 2, 1]
+    assert load_segment("legacy", 2) == [{"ID": 5, "name": "user5"}]
+
+
+def test_mixed_type_column_has_null_stats():
+    stats = core.compute_segment_stats(
+        [{"ID": 1, "name": "alice"}, {"ID": 2, "name": 42}]
+    )
+
+    assert stats["ID"] == {"min": 1, "max": 2}
+    assert stats["name"] is None
+    assert core.segment_may_match(stats, {"name": 42})
+    assert not core.segment_may_match(stats, {"ID": 3})